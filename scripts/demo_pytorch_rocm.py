@@ -18,7 +18,7 @@ def parse_args():
     parser.add_argument("--device", default="cuda:0", help="Device string (default: cuda:0)")
     parser.add_argument("--reserve-mem-gb", type=float, default=0.0, help="Optional GPU memory to reserve")
     parser.add_argument("--warmup", type=int, default=5, help="Warmup iterations")
-    parser.add_argument("--log-interval", type=int, default=10, help="Log every N iterations")
+    parser.add_argument("--log-interval", type=int, default=10, help="GEMMs per captured graph batch; logs once per batch")
     return parser.parse_args()
 
 
@@ -35,7 +35,8 @@ def reserve_memory(device, dtype, gb):
     import torch
     if gb <= 0:
         return None
-    bytes_per_elem = torch.tensor([], device=device, dtype=dtype).element_size()
+    # Element size is fixed per dtype; no need for a probe allocation on the device.
+    bytes_per_elem = {torch.float16: 2, torch.bfloat16: 2, torch.float32: 4}[dtype]
     num_elems = int((gb * (1024 ** 3)) / bytes_per_elem)
     if num_elems <= 0:
         return None
@@ -45,6 +46,13 @@ def reserve_memory(device, dtype, gb):
 def main():
     args = parse_args()
 
+    # TunableOp must be configured before torch is imported. The warmup phase
+    # doubles as the GEMM tuning phase; explicit env settings take precedence.
+    os.environ.setdefault("PYTORCH_TUNABLEOP_ENABLED", "1")
+    os.environ.setdefault("PYTORCH_TUNABLEOP_TUNING", "1")
+    # TunableOp replaces %d with the device ordinal (and would otherwise insert it before ".csv").
+    os.environ.setdefault("PYTORCH_TUNABLEOP_FILENAME", f"tuning_{args.size}_{args.dtype}_%d.csv")
+
     try:
         import torch
     except Exception as exc:
@@ -65,6 +73,9 @@ def main():
     else:
         torch.cuda.set_device(device)
 
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+
     props = torch.cuda.get_device_properties(device)
     print("Device:", props.name)
     print("Total memory (GB):", round(props.total_memory / (1024 ** 3), 2))
@@ -79,27 +90,53 @@ def main():
     a = torch.randn((n, n), device=device, dtype=dtype)
     b = torch.randn((n, n), device=device, dtype=dtype)
 
+    # Persistent output buffer so the captured graph always writes to the same address.
+    c = torch.empty_like(a)
+
     for _ in range(args.warmup):
-        c = a @ b
+        torch.matmul(a, b, out=c)
         torch.cuda.synchronize()
 
+    # Graph capture needs the BLAS handle and workspace set up beforehand; warm
+    # up on a side stream regardless of --warmup, as in the CUDA Graphs recipe.
+    side = torch.cuda.Stream()
+    side.wait_stream(torch.cuda.current_stream())
+    with torch.cuda.stream(side):
+        torch.matmul(a, b, out=c)
+    torch.cuda.current_stream().wait_stream(side)
+    torch.cuda.synchronize()
+
+    # Persist the tuned GEMM selection and stop tuning before graph capture.
+    tunable = getattr(torch.cuda, "tunable", None)
+    if tunable is not None and tunable.is_enabled():
+        tunable.write_file()
+        tunable.tuning_enable(False)
+
+    # Capture a batch of GEMMs once and replay it, so the timed loop pays a
+    # single launch per batch instead of one per matmul.
+    batch = max(1, args.log_interval)
+    graph = torch.cuda.CUDAGraph()
+    with torch.cuda.graph(graph):
+        for _ in range(batch):
+            torch.matmul(a, b, out=c)
+    torch.cuda.synchronize()
+
     print("Starting compute loop...")
     start = time.time()
     iters = 0
     last_log = start
 
     while time.time() - start < args.seconds:
-        c = a @ b
-        if dtype != torch.float32:
-            c = c.float().sum()
+        graph.replay()
         torch.cuda.synchronize()
-        iters += 1
-
-        if iters % args.log_interval == 0:
-            now = time.time()
-            dt = now - last_log
-            last_log = now
-            print(f"iter={iters} elapsed={int(now - start)}s interval={dt:.2f}s")
+        iters += batch
+
+        now = time.time()
+        dt = now - last_log
+        last_log = now
+        # Reduce once per batch, outside the GEMM hot path.
+        checksum = c.sum(dtype=torch.float32).item()
+        print(f"iter={iters} elapsed={int(now - start)}s interval={dt:.2f}s checksum={checksum:.4g}")
 
     elapsed = time.time() - start
     print(f"Done. iters={iters} elapsed={elapsed:.2f}s")
@@ -0,0 +1,155 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+from statistics import mean
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import summarize_rocm_smi  # noqa: E402
+from summarize_rocm_smi import (  # noqa: E402
+    MetricAccumulator,
+    StreamingPercentile,
+    parse_log,
+    percentile,
+    summarize_logs,
+)
+
+SAMPLE_LOG = """\
+ts=1700000000
+GPU  Temp  AvgPwr  SCLK  MCLK  VRAM%  GPU%
+0    45.0c  120.0W  1500Mhz  1600Mhz  12%  97%
+GPU  GPU%  VRAM%  Temp  AvgPwr  SCLK  MCLK
+1    50.0c  130.0W  1400Mhz  1600Mhz  14%  88%
+---
+
+ts=notanint
+GPU[0] : GPU use (%): 50
+GPU[0] : fclk clock level: (1.2Ghz)
+GPU[0] : mclk clock level: 1600Mhz
+GPU[1] : Temperature (Sensor junction) (C): 61.0
+---
+ts=1700000010
+GPU[0] : GPU use (%): 100
+"""
+
+
+class StreamingPercentileTest(unittest.TestCase):
+    def test_exact_up_to_limit(self):
+        rng = random.Random(0)
+        for n in (1, 2, 5, 100, StreamingPercentile.EXACT_LIMIT):
+            values = [rng.uniform(0, 500) for _ in range(n)]
+            est = StreamingPercentile(95)
+            for v in values:
+                est.add(v)
+            self.assertEqual(est.result(), percentile(values, 95))
+
+    def test_long_stream_stays_close(self):
+        rng = random.Random(1)
+        streams = {
+            "uniform": [rng.uniform(0, 100) for _ in range(50000)],
+            "exponential": [rng.expovariate(0.1) for _ in range(50000)],
+            "ascending": sorted(rng.uniform(0, 100) for _ in range(20000)),
+        }
+        for name, values in streams.items():
+            est = StreamingPercentile(95)
+            for v in values:
+                est.add(v)
+            exact = percentile(values, 95)
+            self.assertAlmostEqual(est.result(), exact, delta=0.02 * exact, msg=name)
+
+
+class MetricAccumulatorTest(unittest.TestCase):
+    def test_short_stream_matches_exact_stats(self):
+        values = [312.9353, 57.456, 0.1, 0.2, 0.3, 1e-3]
+        acc = MetricAccumulator()
+        for v in values:
+            acc.add(v)
+        self.assertEqual(
+            acc.finalize(),
+            {"avg": mean(values), "p95": percentile(values, 95), "max": max(values)},
+        )
+
+    def test_long_stream_average(self):
+        rng = random.Random(2)
+        values = [rng.uniform(0, 1000) for _ in range(10000)]
+        acc = MetricAccumulator()
+        for v in values:
+            acc.add(v)
+        self.assertAlmostEqual(acc.finalize()["avg"], mean(values), places=9)
+
+    def test_empty(self):
+        self.assertIsNone(MetricAccumulator().finalize())
+
+
+class ParseLogTest(unittest.TestCase):
+    def test_mixed_log(self):
+        samples, start_ts, end_ts, metrics = parse_log(SAMPLE_LOG.splitlines(True))
+        # The blank line after the first "---" opens a sample of its own.
+        self.assertEqual(samples, 4)
+        # ts=notanint still delimits a sample but does not move the time range.
+        self.assertEqual((start_ts, end_ts), (1700000000, 1700000010))
+
+        stats = {gpu: {key: acc.finalize()["max"] for key, acc in keys.items()} for gpu, keys in metrics.items()}
+        self.assertEqual(
+            stats,
+            {
+                "0": {
+                    "temp_c": 45.0,
+                    "power_w": 120.0,
+                    "sclk_mhz": 1500.0,
+                    "mclk_mhz": 1600.0,
+                    "vram_util_pct": 12.0,
+                    "gpu_util_pct": 100.0,
+                    "fclk_mhz": 1200.0,
+                },
+                # The reordered second header is ignored; the row keeps the first layout.
+                "1": {
+                    "temp_c": 50.0,
+                    "power_w": 130.0,
+                    "sclk_mhz": 1400.0,
+                    "mclk_mhz": 1600.0,
+                    "vram_util_pct": 14.0,
+                    "gpu_util_pct": 88.0,
+                    "temp_junction_c": 61.0,
+                },
+            },
+        )
+        self.assertEqual(metrics["0"]["gpu_util_pct"].finalize()["avg"], mean([97.0, 50.0, 100.0]))
+
+    def test_empty_log_warns(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            open(os.path.join(log_dir, "empty.log"), "w").close()
+            summary = summarize_logs(log_dir, workers=1)
+        self.assertEqual(summary["nodes"]["empty"]["samples"], 0)
+        self.assertEqual(summary["nodes"]["empty"]["gpus"], {})
+        self.assertEqual(summary["warnings"], ["No parseable metrics in empty.log"])
+
+
+@unittest.skipIf(summarize_rocm_smi.orjson is None, "orjson not installed")
+class DumpsTest(unittest.TestCase):
+    def test_orjson_matches_stdlib_on_ascii(self):
+        # The two encoders only agree on ASCII text and floats that both print
+        # in positional notation; see the README note on orjson.
+        summary = {
+            "log_dir": "/scratch/project/user/lumi-profile/123",
+            "nodes": {
+                "nid005001": {
+                    "samples": 30,
+                    "start_ts": 1700000000,
+                    "end_ts": None,
+                    "gpus": {"0": {"gpu_util_pct": {"avg": 57.456, "p95": 312.9353, "max": 100.0}}},
+                },
+            },
+            "warnings": ["No parseable metrics in nid005002.log"],
+        }
+        for pretty in (True, False):
+            fast = summarize_rocm_smi.dumps(summary, pretty=pretty)
+            with mock.patch.object(summarize_rocm_smi, "orjson", None):
+                self.assertEqual(summarize_rocm_smi.dumps(summary, pretty=pretty), fast)
+
+
+if __name__ == "__main__":
+    unittest.main()